@@ -15,6 +15,7 @@ import uuid
 import argparse
 import sys
 import signal
+import math
 
 try:
     import websockets
@@ -23,6 +24,20 @@ except ImportError:
     print("请运行: pip install websockets")
     sys.exit(1)
 
+# 优先使用 orjson 加速服务器消息的 JSON 解码，未安装时回退到标准库 json
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import numpy as np
+except ImportError:
+    print("错误: 需要安装 numpy 库")
+    print("请运行: pip install numpy")
+    sys.exit(1)
+
 try:
     import pyaudio
 except ImportError:
@@ -41,9 +56,61 @@ CHUNK_MS = int(CHUNK_SIZE / SAMPLE_RATE * 1000)  # 32ms
 SEND_BATCH_MS = 200  # 每200ms发送一次
 SEND_BATCH_SIZE = int(SAMPLE_RATE * SEND_BATCH_MS / 1000)  # 3200样本 = 6400字节
 
+# 控制消息模板（仅 mid 每次不同，导入时编码一次，使用 % 填入 mid）
+BEGIN_REQUEST_TEMPLATE = json.dumps({
+    "header": {"name": "Begin", "mid": "%s"},
+    "payload": {"fmt": "pcm", "rate": SAMPLE_RATE, "itn": True, "silence": 800}
+}, ensure_ascii=False, separators=(",", ":"))
+END_REQUEST_TEMPLATE = json.dumps({
+    "header": {"name": "End", "mid": "%s"},
+    "payload": {}
+}, ensure_ascii=False, separators=(",", ":"))
+
+
+def rms_i16(data, scratch=None):
+    """
+    计算 16 位 PCM 音频的 RMS 值（替代已废弃的 audioop.rms）
+
+    Args:
+        data: 16 位小端 PCM 音频数据
+        scratch: 可选的 int32 预分配数组，长度需与样本数一致，用于避免每次分配
+    """
+    samples = np.frombuffer(data, dtype=np.int16)
+    if samples.size == 0:
+        return 0
+    if scratch is None or scratch.shape != samples.shape:
+        scratch = np.empty(samples.shape, dtype=np.int32)
+    np.multiply(samples, samples, out=scratch, dtype=np.int32)
+    return int(math.sqrt(scratch.mean()))
+
+
+class Sentence:
+    """当前句子的识别状态，整个会话复用同一个对象"""
+
+    __slots__ = ("active", "index", "begin_time", "current_result", "current_time")
+
+    def __init__(self):
+        self.reset()
+
+    def begin(self, index, begin_time):
+        """开始新的句子"""
+        self.active = True
+        self.index = index
+        self.begin_time = begin_time
+        self.current_result = None
+        self.current_time = 0
+
+    def reset(self):
+        """句子结束，清除状态"""
+        self.active = False
+        self.index = 0
+        self.begin_time = 0
+        self.current_result = None
+        self.current_time = 0
+
 
 class AudioRecorder:
-    """音频录制器，使用 pyaudio 从麦克风采集音频"""
+    """音频录制器，使用 pyaudio 回调模式从麦克风采集音频"""
 
     def __init__(self, sample_rate=SAMPLE_RATE, channels=CHANNELS, chunk_size=CHUNK_SIZE):
         self.sample_rate = sample_rate
@@ -52,33 +119,51 @@ class AudioRecorder:
         self.audio = pyaudio.PyAudio()
         self.stream = None
         self.is_recording = False
+        self._loop = None
+        self._audio_queue = None
 
-    def start(self):
-        """开始录制"""
+    def _callback(self, in_data, frame_count, time_info, status):
+        """PortAudio 回调，在其音频线程中执行，直接把音频块投递到事件循环的队列"""
+        try:
+            self._loop.call_soon_threadsafe(self._audio_queue.put_latest, in_data)
+        except RuntimeError:
+            # 事件循环已关闭
+            return (None, pyaudio.paComplete)
+        return (None, pyaudio.paContinue)
+
+    def start(self, loop, audio_queue):
+        """
+        开始录制
+
+        Args:
+            loop: 接收音频的事件循环
+            audio_queue: AudioChunkQueue，接收音频块，停止录制后放入 None 表示结束
+        """
+        self._loop = loop
+        self._audio_queue = audio_queue
+        self.is_recording = True
         self.stream = self.audio.open(
             format=FORMAT,
             channels=self.channels,
             rate=self.sample_rate,
             input=True,
-            frames_per_buffer=self.chunk_size
+            frames_per_buffer=self.chunk_size,
+            stream_callback=self._callback
         )
-        self.is_recording = True
         print(f"麦克风已启动: {self.sample_rate}Hz, {self.channels}声道, 16位")
 
-    def read_chunk(self):
-        """读取一块音频数据"""
-        if self.stream and self.is_recording:
-            return self.stream.read(self.chunk_size, exception_on_overflow=False)
-        return None
-
     def stop(self):
-        """停止录制"""
+        """停止录制（需在事件循环线程中调用）"""
+        was_recording = self.is_recording
         self.is_recording = False
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
             self.stream = None
-        print("麦克风已停止")
+        if was_recording:
+            # 放入结束标记，唤醒等待音频的发送循环
+            self._audio_queue.put_latest(None)
+            print("麦克风已停止")
 
     def __del__(self):
         """清理资源"""
@@ -97,51 +182,71 @@ async def receive_messages(ws, task_id):
         task_id: 任务 ID
     """
     message_count = 0
-    current_sentence = None
-    timeout_count = 0
-    MAX_TIMEOUTS = 15  # 最多允许连续超时次数（15秒）
+    current_sentence = Sentence()
 
     # npm 风格动画帧
     animation_frames = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
     animation_idx = 0
+    # 上一次渲染的状态行内容，未变化时跳过写入
+    last_render = None
     # 控制蛇形动画的标志
     show_snake_animation = True
     snake_stop_event = asyncio.Event()
 
+    # 按秒缓存已格式化的时间字符串，相邻的 Result 消息大多落在同一秒内
+    hms_cache = {}
+    duration_cache = {}
+    MAX_TIME_CACHE = 1024
+
     def format_time_hms(ms):
         """将毫秒转换为 HH:MM:SS 格式（开始时间）"""
-        seconds = ms // 1000
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        seconds = seconds % 60
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        key = ms // 1000
+        text = hms_cache.get(key)
+        if text is None:
+            hours, rem = divmod(key, 3600)
+            minutes, seconds = divmod(rem, 60)
+            text = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+            if len(hms_cache) >= MAX_TIME_CACHE:
+                hms_cache.clear()
+            hms_cache[key] = text
+        return text
 
     def format_duration(ms):
         """将毫秒转换为 MM:SS 格式（持续时间）"""
-        seconds = ms // 1000
-        minutes = seconds // 60
-        seconds = seconds % 60
-        return f"{minutes:02d}:{seconds:02d}"
+        key = ms // 1000
+        text = duration_cache.get(key)
+        if text is None:
+            minutes, seconds = divmod(key, 60)
+            text = f"{minutes:02d}:{seconds:02d}"
+            if len(duration_cache) >= MAX_TIME_CACHE:
+                duration_cache.clear()
+            duration_cache[key] = text
+        return text
 
     def update_display(time_ms, begin_time, result, sentence_idx=None):
         """在同一行动态更新显示"""
-        nonlocal animation_idx
+        nonlocal animation_idx, last_render
 
         # 计算持续时间
         duration_ms = time_ms - begin_time
 
         # 构建显示内容
         time_str = f"{format_time_hms(begin_time)} - {format_duration(duration_ms)}"
-        animation = animation_frames[animation_idx % len(animation_frames)]
-        animation_idx += 1
-
-        # 清空当前行并显示新内容
         if sentence_idx is not None:
-            display = f"\r{animation} {sentence_idx}. {time_str} | {result:<50}"
+            content = f"{sentence_idx}. {time_str} | {result}"
         else:
-            display = f"\r{animation} {time_str} | {result:<50}"
+            content = f"{time_str} | {result}"
+
+        # 内容未变化时不重复写终端
+        if content == last_render:
+            return
+        last_render = content
+
+        animation = animation_frames[animation_idx % len(animation_frames)]
+        animation_idx += 1
 
-        sys.stdout.write(display)
+        # 回到行首显示新内容，并清除到行尾
+        sys.stdout.write(f"\r{animation} {content}\x1b[K")
         sys.stdout.flush()
 
     async def snake_animation():
@@ -151,19 +256,22 @@ async def receive_messages(ws, task_id):
         pos = 0
         direction = 1
 
+        def make_bar(pos):
+            """构建蛇头位于 pos 的蛇形条"""
+            snake_bar = ["·"] * width
+            for i in range(max(0, pos - 2), min(width, pos + 1)):
+                snake_bar[i] = "="
+            return "".join(snake_bar)
+
+        # 预先构建所有位置的蛇形条，每帧只需查表
+        bars = tuple(make_bar(p) for p in range(width))
+
         while not snake_stop_event.is_set():
             if not show_snake_animation:
                 await asyncio.sleep(0.05)
                 continue
 
-            # 构建蛇形条
-            snake_bar = ["·"] * width
-            for i in range(max(0, pos - 2), min(width, pos + 1)):
-                snake_bar[i] = "="
-            if pos < width:
-                snake_bar[pos] = "="
-
-            output = f"\r  等待语音输入 [{''.join(snake_bar)}]"
+            output = f"\r  等待语音输入 [{bars[pos]}]"
             sys.stdout.write(output)
             sys.stdout.flush()
 
@@ -177,94 +285,103 @@ async def receive_messages(ws, task_id):
             await asyncio.sleep(0.1)
 
         # 清除蛇形动画行
-        sys.stdout.write("\r" + " " * 80 + "\r")
+        sys.stdout.write("\r\x1b[2K")
         sys.stdout.flush()
 
+    def on_started(payload):
+        """处理 Started 消息"""
+        nonlocal show_snake_animation
+        session_id = payload.get("sid", "")
+        # 清除蛇形动画并显示启动信息
+        if show_snake_animation:
+            show_snake_animation = False
+            sys.stdout.write("\r\x1b[2K")
+            sys.stdout.flush()
+        print(f"✓ 转录会话已启动 (session_id: {session_id})")
+        # 恢复蛇形动画
+        show_snake_animation = True
+
+    def on_sentence_begin(payload):
+        """处理 SentenceBegin 消息"""
+        index = payload.get("idx", 0)
+        time_ms = payload.get("time", 0)
+        current_sentence.begin(index, time_ms)
+
+    def on_result(payload):
+        """处理 Result 消息"""
+        nonlocal show_snake_animation
+        index = payload.get("idx", 0)
+        result = payload.get("text", "")
+        time_ms = payload.get("time", 0)
+
+        # 停止蛇形动画，显示识别结果
+        if show_snake_animation:
+            show_snake_animation = False
+            sys.stdout.write("\r\x1b[2K")
+            sys.stdout.flush()
+
+        # 动态更新显示（需要获取 begin_time）
+        begin_time = current_sentence.begin_time if current_sentence.active else time_ms
+        update_display(time_ms, begin_time, result, index)
+
+        if current_sentence.active and current_sentence.index == index:
+            current_sentence.current_result = result
+            current_sentence.current_time = time_ms
+
+    def on_sentence_end(payload):
+        """处理 SentenceEnd 消息"""
+        nonlocal show_snake_animation, last_render
+        index = payload.get("idx", 0)
+        result = payload.get("text", "")
+        begin_time = payload.get("begin", 0)
+        end_time = payload.get("time", 0)
+        speaker = payload.get("speaker", "")
+
+        # 句子结束时，清除当前行并显示最终结果
+        sys.stdout.write("\r\x1b[2K")
+
+        duration_ms = end_time - begin_time
+        time_str = f"{format_time_hms(begin_time)} - {format_duration(duration_ms)}"
+
+        # Format with speaker info if available
+        if speaker:
+            print(f"✓ {index}. {time_str} | [{speaker}] {result}")
+        else:
+            print(f"✓ {index}. {time_str} | {result}")
+
+        current_sentence.reset()
+        last_render = None
+        # 句子结束后，恢复蛇形动画
+        show_snake_animation = True
+
+    # 消息名到处理函数的分发表（Completed/Failed 需要结束循环，单独处理）
+    handlers = {
+        "Started": on_started,
+        "SentenceBegin": on_sentence_begin,
+        "Result": on_result,
+        "SentenceEnd": on_sentence_end,
+    }
+
     # 启动蛇形动画任务
     snake_task = asyncio.create_task(snake_animation())
 
     try:
         while True:
-            try:
-                message = await asyncio.wait_for(ws.recv(), timeout=1.0)
-                timeout_count = 0  # 重置超时计数
-            except asyncio.TimeoutError:
-                timeout_count += 1
-                if timeout_count >= MAX_TIMEOUTS:
-                    # 连续超时，认为没有更多消息了
-                    break
-                continue
+            # 直接等待下一条消息；会话结束由 Completed/Failed、连接关闭
+            # 或调用方在发送 End 后的整体超时来决定
+            message = await ws.recv()
 
             if isinstance(message, str):
                 try:
-                    data = json.loads(message)
+                    data = json_loads(message)
                     header = data.get("header", {})
                     name = header.get("name", "UNKNOWN")
                     status = header.get("status", -1)
                     message_count += 1
 
-                    if name == "Started":
-                        session_id = data.get("payload", {}).get("sid", "")
-                        # 清除蛇形动画并显示启动信息
-                        if show_snake_animation:
-                            show_snake_animation = False
-                            sys.stdout.write("\r" + " " * 80 + "\r")
-                            sys.stdout.flush()
-                        print(f"✓ 转录会话已启动 (session_id: {session_id})")
-                        # 恢复蛇形动画
-                        show_snake_animation = True
-
-                    elif name == "SentenceBegin":
-                        payload = data.get("payload", {})
-                        index = payload.get("idx", 0)
-                        time_ms = payload.get("time", 0)
-                        current_sentence = {"index": index, "begin_time": time_ms}
-
-                    elif name == "Result":
-                        payload = data.get("payload", {})
-                        index = payload.get("idx", 0)
-                        result = payload.get("text", "")
-                        time_ms = payload.get("time", 0)
-
-                        # 停止蛇形动画，显示识别结果
-                        if show_snake_animation:
-                            show_snake_animation = False
-                            sys.stdout.write("\r" + " " * 80 + "\r")
-                            sys.stdout.flush()
-
-                        # 动态更新显示（需要获取 begin_time）
-                        begin_time = current_sentence.get("begin_time", time_ms) if current_sentence else time_ms
-                        update_display(time_ms, begin_time, result, index)
-
-                        if current_sentence and current_sentence["index"] == index:
-                            current_sentence["current_result"] = result
-                            current_sentence["current_time"] = time_ms
-
-                    elif name == "SentenceEnd":
-                        payload = data.get("payload", {})
-                        index = payload.get("idx", 0)
-                        result = payload.get("text", "")
-                        begin_time = payload.get("begin", 0)
-                        end_time = payload.get("time", 0)
-                        speaker = payload.get("speaker", "")
-                        speaker_id = payload.get("speaker_id", "")
-
-                        # 句子结束时，换行显示最终结果
-                        sys.stdout.write("\r")
-                        sys.stdout.flush()
-
-                        duration_ms = end_time - begin_time
-                        time_str = f"{format_time_hms(begin_time)} - {format_duration(duration_ms)}"
-
-                        # Format with speaker info if available
-                        if speaker:
-                            print(f"✓ {index}. {time_str} | [{speaker}] {result}")
-                        else:
-                            print(f"✓ {index}. {time_str} | {result}")
-
-                        current_sentence = None
-                        # 句子结束后，恢复蛇形动画
-                        show_snake_animation = True
+                    handler = handlers.get(name)
+                    if handler is not None:
+                        handler(data.get("payload", {}))
 
                     elif name == "Completed":
                         break
@@ -290,21 +407,37 @@ async def receive_messages(ws, task_id):
     return message_count
 
 
-async def send_audio_loop(ws, recorder, stop_event, silence_threshold=200, max_silence_seconds=5.0):
+class AudioChunkQueue(asyncio.Queue):
+    """音频块队列，队列满时丢弃最旧的一块并计数"""
+
+    def __init__(self, maxsize=16):
+        super().__init__(maxsize)
+        self.dropped = 0  # 因队列满被丢弃的音频块数
+
+    def put_latest(self, chunk):
+        """在事件循环线程中放入音频块，队列满时丢弃最旧的一块"""
+        if self.full():
+            self.get_nowait()
+            self.dropped += 1
+        self.put_nowait(chunk)
+
+
+async def send_audio_loop(ws, audio_queue, stop_event, silence_threshold=200, max_silence_seconds=5.0):
     """
-    持续从麦克风读取音频并发送到服务器
+    持续从音频队列读取麦克风数据并发送到服务器
 
     Args:
         ws: WebSocket 连接
-        recorder: 音频录制器
+        audio_queue: 音频块队列（由录音回调填充）
         stop_event: 停止事件
         silence_threshold: 静音阈值（RMS值，低于此值视为静音）
         max_silence_seconds: 最大静音时长（秒），超过后自动停止发送
     """
-    import audioop
-    import math
-
-    buffer = b''
+    # 预分配两个批次大小的缓冲区，避免每次读取都重新分配 bytes
+    buffer = bytearray(SEND_BATCH_SIZE * 2)
+    write_pos = 0
+    # RMS 计算用的预分配数组
+    rms_scratch = np.empty(SEND_BATCH_SIZE // 2, dtype=np.int32)
     batch_count = 0
     silence_count = 0  # 连续静音的批次计数
     max_silence_batches = int(max_silence_seconds * 1000 / SEND_BATCH_MS)  # 将秒转换为批次数
@@ -313,20 +446,24 @@ async def send_audio_loop(ws, recorder, stop_event, silence_threshold=200, max_s
     #print(f"[发送线程] 静音检测阈值: {silence_threshold}, 最大静音时长: {max_silence_seconds}秒")
 
     while not stop_event.is_set():
-        # 从麦克风读取一块音频（使用线程池避免阻塞事件循环）
-        chunk = await asyncio.to_thread(recorder.read_chunk)
+        # 从录音回调填充的队列中取出一块音频
+        chunk = await audio_queue.get()
         if chunk is None:
             break
 
-        buffer += chunk
+        buffer[write_pos:write_pos + len(chunk)] = chunk
+        write_pos += len(chunk)
 
         # 当缓冲区达到一个批次大小时发送
-        if len(buffer) >= SEND_BATCH_SIZE:
-            batch_data = buffer[:SEND_BATCH_SIZE]
-            buffer = buffer[SEND_BATCH_SIZE:]
+        if write_pos >= SEND_BATCH_SIZE:
+            batch_data = bytes(memoryview(buffer)[:SEND_BATCH_SIZE])
+            # 将剩余数据移回缓冲区开头
+            remaining = write_pos - SEND_BATCH_SIZE
+            buffer[:remaining] = buffer[SEND_BATCH_SIZE:write_pos]
+            write_pos = remaining
 
             # 检测音量（RMS）
-            rms = audioop.rms(batch_data, 2)  # 2 bytes per sample (16-bit)
+            rms = rms_i16(batch_data, rms_scratch)
             is_silence = rms < silence_threshold
 
             if is_silence:
@@ -354,7 +491,8 @@ async def send_audio_loop(ws, recorder, stop_event, silence_threshold=200, max_s
                 print(f"\n[发送线程] 发送音频错误: {e}")
                 break
 
-    print(f"[发送线程] 音频发送完成，共发送 {batch_count} 个批次")
+    print(f"[发送线程] 音频发送完成，共发送 {batch_count} 个批次，"
+          f"因队列满丢弃 {audio_queue.dropped} 个音频块")
 
 
 async def run_microphone_test(server_url: str, auto_stop: bool = False, max_silence: float = 3.0):
@@ -377,31 +515,19 @@ async def run_microphone_test(server_url: str, auto_stop: bool = False, max_sile
     recorder = AudioRecorder()
 
     try:
-        async with websockets.connect(server_url, ping_timeout=120) as ws:
+        async with websockets.connect(server_url, ping_timeout=120,
+                                      compression=None) as ws:
             print("WebSocket 连接成功！\n")
 
             # 发送 Begin 请求
             print("[1] 发送 Begin 请求...")
-            start_request = {
-                "header": {
-                    "name": "Begin",
-                    "mid": message_id
-                },
-                "payload": {
-                    "fmt": "pcm",
-                    "rate": SAMPLE_RATE,
-                    "itn": True,
-                    "silence": 800
-                }
-            }
-
-            await ws.send(json.dumps(start_request, ensure_ascii=False))
+            await ws.send(BEGIN_REQUEST_TEMPLATE % message_id)
             print(f"请求已发送\n")
 
             # 等待 Started 响应
             print("[2] 等待服务器确认...")
             response_text = await asyncio.wait_for(ws.recv(), timeout=10)
-            response = json.loads(response_text)
+            response = json_loads(response_text)
 
             if (response.get("header", {}).get("name") != "Started" or
                 response.get("header", {}).get("status") != 20000000):
@@ -409,25 +535,45 @@ async def run_microphone_test(server_url: str, auto_stop: bool = False, max_sile
                 print(f"响应: {json.dumps(response, ensure_ascii=False, indent=2)}")
                 return
 
-            # 启动音频录制和消息接收
-            recorder.start()
+            # 启动音频录制（回调直接投递到队列）和消息接收
+            loop = asyncio.get_running_loop()
+            audio_queue = AudioChunkQueue(maxsize=16)
+            recorder.start(loop, audio_queue)
             stop_event = asyncio.Event()
 
             # 创建并发任务
             receive_task = asyncio.create_task(receive_messages(ws, task_id))
-            send_task = asyncio.create_task(send_audio_loop(ws, recorder, stop_event,
+            send_task = asyncio.create_task(send_audio_loop(ws, audio_queue, stop_event,
                                                            silence_threshold=200,
                                                            max_silence_seconds=5.0))
 
+            # Ctrl+C / SIGTERM 设置停止事件并放入结束标记，即使麦克风不再产生
+            # 音频，发送循环也会立即退出，保证随后能发出 End 消息
+            def on_stop_signal():
+                if not stop_event.is_set():
+                    print("\n\n检测到用户中断...")
+                    stop_event.set()
+                    audio_queue.put_latest(None)
+
+            stop_signals = []
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, on_stop_signal)
+                    stop_signals.append(sig)
+                except (NotImplementedError, RuntimeError):
+                    # Windows 事件循环不支持 add_signal_handler
+                    pass
+
             print("\n提示: 按 Ctrl+C 停止录制\n")
             print("=" * 60)
 
-            # 等待用户中断
+            # 等待发送结束（静音自动停止或用户中断）
             try:
                 await send_task
-            except KeyboardInterrupt:
-                print("\n\n检测到用户中断...")
-                stop_event.set()
+            finally:
+                # 恢复默认信号处理，等待结果期间再次 Ctrl+C 可直接退出
+                for sig in stop_signals:
+                    loop.remove_signal_handler(sig)
 
             # 取消发送任务
             if not send_task.done():
@@ -442,15 +588,7 @@ async def run_microphone_test(server_url: str, auto_stop: bool = False, max_sile
 
             # 发送 End 消息
             print("\n[3] 发送 End 消息...")
-            stop_request = {
-                "header": {
-                    "name": "End",
-                    "mid": str(uuid.uuid4())
-                },
-                "payload": {}
-            }
-
-            await ws.send(json.dumps(stop_request, ensure_ascii=False))
+            await ws.send(END_REQUEST_TEMPLATE % uuid.uuid4())
 
             # 等待所有识别结果
             print("[4] 等待最终识别结果（最多10秒）...")
@@ -482,6 +620,21 @@ async def run_microphone_test(server_url: str, auto_stop: bool = False, max_sile
         recorder.stop()
 
 
+def run_event_loop(main_coro):
+    """运行协程，Linux/macOS 上如已安装 uvloop 则使用 uvloop 事件循环"""
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            # uvloop.run 从 0.18 起才提供，旧版本（如发行版自带的包）改用 install
+            if hasattr(uvloop, "run"):
+                return uvloop.run(main_coro)
+            uvloop.install()
+    return asyncio.run(main_coro)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="zasr-server 麦克风实时语音识别客户端",
@@ -528,7 +681,7 @@ def main():
 
     # 运行麦克风测试
     try:
-        asyncio.run(run_microphone_test(args.server))
+        run_event_loop(run_microphone_test(args.server))
     except KeyboardInterrupt:
         print("\n\n程序已退出")
 
@@ -25,13 +25,58 @@ except ImportError:
     print("请运行: pip install websockets")
     sys.exit(1)
 
-async def test_zasr_server_new(audio_file: str, server_url: str = "ws://localhost:2026"):
+# 优先使用 orjson 加速服务器消息的 JSON 解码，未安装时回退到标准库 json
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# 控制消息模板（仅 mid 每次不同，导入时编码一次，使用 % 填入 mid）
+BEGIN_REQUEST_TEMPLATE = json.dumps({
+    "header": {"name": "Begin", "mid": "%s"},
+    "payload": {"fmt": "pcm", "rate": 16000, "itn": True, "silence": 500}
+}, ensure_ascii=False, separators=(",", ":"))
+END_REQUEST_TEMPLATE = json.dumps({
+    "header": {"name": "End", "mid": "%s"},
+    "payload": {}
+}, ensure_ascii=False, separators=(",", ":"))
+
+
+class Sentence:
+    """当前句子的识别状态，整个会话复用同一个对象"""
+
+    __slots__ = ("active", "index", "begin_time", "current_result", "current_time")
+
+    def __init__(self):
+        self.reset()
+
+    def begin(self, index, begin_time):
+        """开始新的句子"""
+        self.active = True
+        self.index = index
+        self.begin_time = begin_time
+        self.current_result = None
+        self.current_time = 0
+
+    def reset(self):
+        """句子结束，清除状态"""
+        self.active = False
+        self.index = 0
+        self.begin_time = 0
+        self.current_result = None
+        self.current_time = 0
+
+
+async def test_zasr_server_new(audio_file: str, server_url: str = "ws://localhost:2026",
+                               batches_per_send: int = 1):
     """
     测试 zasr-server 的识别功能
     
     Args:
         audio_file: 音频文件路径（WAV格式）
         server_url: WebSocket 服务器地址
+        batches_per_send: 每个 WebSocket 帧合并发送的批次数
     """
     
     print(f"连接到服务器: {server_url}")
@@ -46,24 +91,25 @@ async def test_zasr_server_new(audio_file: str, server_url: str = "ws://localhos
     # 2. 读取 WAV 文件
     print("读取音频文件...")
     try:
-        with wave.open(audio_file, 'rb') as wf:
-            # 检查格式
-            if wf.getnchannels() != 1:
-                print(f"警告: 音频文件不是单声道（当前: {wf.getnchannels()}声道）")
-                print("期望: 1声道（单声道）")
-            
-            if wf.getsampwidth() != 2:
-                print(f"警告: 音频采样宽度不是16位（当前: {wf.getsampwidth()}字节）")
-                print("期望: 2字节（16位）")
-            
-            if wf.getframerate() != 16000:
-                print(f"警告: 音频采样率不是16000Hz（当前: {wf.getframerate()}Hz）")
-                print("期望: 16000Hz")
-            
-            # 读取音频数据
-            audio_data = wf.readframes(wf.getnframes())
-            print(f"音频数据大小: {len(audio_data)} 字节")
-            print(f"音频时长: {len(audio_data) / 2 / 16000:.2f} 秒")
+        # 文件保持打开，发送时按批次流式读取，不一次性载入内存
+        wf = wave.open(audio_file, 'rb')
+
+        # 检查格式
+        if wf.getnchannels() != 1:
+            print(f"警告: 音频文件不是单声道（当前: {wf.getnchannels()}声道）")
+            print("期望: 1声道（单声道）")
+        
+        if wf.getsampwidth() != 2:
+            print(f"警告: 音频采样宽度不是16位（当前: {wf.getsampwidth()}字节）")
+            print("期望: 2字节（16位）")
+        
+        if wf.getframerate() != 16000:
+            print(f"警告: 音频采样率不是16000Hz（当前: {wf.getframerate()}Hz）")
+            print("期望: 16000Hz")
+        
+        audio_size = wf.getnframes() * wf.getsampwidth() * wf.getnchannels()
+        print(f"音频数据大小: {audio_size} 字节")
+        print(f"音频时长: {audio_size / 2 / 16000:.2f} 秒")
     except Exception as e:
         print(f"读取音频文件失败: {e}")
         sys.exit(1)
@@ -73,35 +119,24 @@ async def test_zasr_server_new(audio_file: str, server_url: str = "ws://localhos
     batch_size_ms = 200 #60
     batch_size = int(sample_rate * batch_size_ms / 1000) * 2  # 字节数
     
-    print(f"每次发送: {batch_size} 字节 ({batch_size_ms}ms)")
+    print(f"每次发送: {batch_size * batches_per_send} 字节 ({batch_size_ms * batches_per_send}ms)")
     
     # 3. 连接 WebSocket
     try:
-        async with websockets.connect(server_url, ping_timeout=120) as ws:
+        async with websockets.connect(server_url, ping_timeout=120,
+                                      compression=None) as ws:
             print("WebSocket 连接成功！")
             
             # 4. 发送 Begin 请求
             print("\n[1] 发送 Begin 请求...")
-            start_request = {
-                "header": {
-                    "name": "Begin",
-                    "mid": message_id
-                },
-                "payload": {
-                    "fmt": "pcm",
-                    "rate": 16000,
-                    "itn": True,
-                    "silence": 500
-                }
-            }
-
-            await ws.send(json.dumps(start_request, ensure_ascii=False))
-            print(f"发送: {json.dumps(start_request, ensure_ascii=False, indent=2)}")
+            start_request = BEGIN_REQUEST_TEMPLATE % message_id
+            await ws.send(start_request)
+            print(f"发送: {start_request}")
 
             # 5. 接收 Started 响应
             print("\n[2] 等待 Started 响应...")
             response_text = await asyncio.wait_for(ws.recv(), timeout=10)
-            response = json.loads(response_text)
+            response = json_loads(response_text)
             print(f"收到: {json.dumps(response, ensure_ascii=False, indent=2)}")
 
             if (response.get("header", {}).get("name") != "Started" or
@@ -118,7 +153,8 @@ async def test_zasr_server_new(audio_file: str, server_url: str = "ws://localhos
             print(f"\n[3] 开始发送音频数据...")
 
             # 同时启动发送和接收任务
-            send_task = asyncio.create_task(send_audio_data(ws, audio_data, batch_size, batch_size_ms))
+            send_task = asyncio.create_task(send_audio_data(ws, wf, batch_size, batch_size_ms,
+                                                            batches_per_send))
             receive_task = asyncio.create_task(receive_messages_new(ws, task_id))
 
             # 等待发送完成
@@ -127,16 +163,9 @@ async def test_zasr_server_new(audio_file: str, server_url: str = "ws://localhos
 
             # 7. 发送 End 消息
             print("\n[4] 发送 End 消息...")
-            stop_request = {
-                "header": {
-                    "name": "End",
-                    "mid": str(uuid.uuid4())
-                },
-                "payload": {}
-            }
-
-            await ws.send(json.dumps(stop_request, ensure_ascii=False))
-            print(f"发送: {json.dumps(stop_request, ensure_ascii=False, indent=2)}")
+            stop_request = END_REQUEST_TEMPLATE % uuid.uuid4()
+            await ws.send(stop_request)
+            print(f"发送: {stop_request}")
             
             # 8. 等待 TranscriptionCompleted 响应和所有识别结果
             print("\n[5] 等待识别结果和转录完成...")
@@ -156,71 +185,100 @@ async def test_zasr_server_new(audio_file: str, server_url: str = "ws://localhos
         print(f"错误: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        wf.close()
 
 
-async def send_audio_data(ws, audio_data, batch_size, batch_size_ms):
+async def send_audio_data(ws, wf, batch_size, batch_size_ms, batches_per_send=1):
     """
-    发送音频数据的独立协程
+    发送音频数据的独立协程，按批次从 WAV 文件流式读取
 
     Args:
         ws: WebSocket 连接
-        audio_data: 音频数据（bytes）
+        wf: 已打开的 wave.Wave_read 对象
         batch_size: 每批发送的音频字节数
         batch_size_ms: 每批音频的毫秒数
+        batches_per_send: 合并到一个 WebSocket 帧中发送的批次数，
+            大于 1 时减少帧头和 write 系统调用，但会增加延迟
     """
     total_sent = 0
     batch_count = 0
+    frames_per_batch = batch_size // (wf.getsampwidth() * wf.getnchannels())
+    frames_per_send = frames_per_batch * batches_per_send
 
-    for offset in range(0, len(audio_data), batch_size):
-        batch = audio_data[offset:offset+batch_size]
+    # 按固定时钟节拍发送：发送耗时不累加到节拍上，落后时立即追赶
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+
+    while True:
+        batch = wf.readframes(frames_per_send)
+        if not batch:
+            break
 
         # 如果最后一批数据不足，用 0 填充
-        if len(batch) < batch_size:
-            batch = batch + b'\x00' * (batch_size - len(batch))
+        remainder = len(batch) % batch_size
+        if remainder:
+            batch = batch + b'\x00' * (batch_size - remainder)
 
         await ws.send(batch)
         total_sent += len(batch)
-        batch_count += 1
+        batch_count += len(batch) // batch_size
 
-        # 等待指定时间，模拟实时音频流
-        await asyncio.sleep(batch_size_ms / 1000.0)
+        # 等待到下一批的发送时刻，模拟实时音频流
+        deadline = start_time + batch_count * batch_size_ms / 1000.0
+        await asyncio.sleep(max(0.0, deadline - loop.time()))
 
 
 async def receive_messages_new(ws, task_id):
     """
     接收 WebSocket 消息
     """
-    import sys
-
     message_count = 0
     all_results = []
-    current_sentence = None
+    current_sentence = Sentence()
     # npm 风格动画帧
     animation_frames = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
     animation_idx = 0
+    # 上一次渲染的状态行内容，未变化时跳过写入
+    last_render = None
     last_display_time = -1
     # 控制蛇形动画的标志
     show_snake_animation = True
     snake_stop_event = asyncio.Event()
 
+    # 按秒缓存已格式化的时间字符串，相邻的 Result 消息大多落在同一秒内
+    hms_cache = {}
+    duration_cache = {}
+    MAX_TIME_CACHE = 1024
+
     def format_time_hms(ms):
         """将毫秒转换为 HH:MM:SS 格式（开始时间）"""
-        seconds = ms // 1000
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        seconds = seconds % 60
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        key = ms // 1000
+        text = hms_cache.get(key)
+        if text is None:
+            hours, rem = divmod(key, 3600)
+            minutes, seconds = divmod(rem, 60)
+            text = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+            if len(hms_cache) >= MAX_TIME_CACHE:
+                hms_cache.clear()
+            hms_cache[key] = text
+        return text
 
     def format_duration(ms):
         """将毫秒转换为 MM:SS 格式（持续时间）"""
-        seconds = ms // 1000
-        minutes = seconds // 60
-        seconds = seconds % 60
-        return f"{minutes:02d}:{seconds:02d}"
+        key = ms // 1000
+        text = duration_cache.get(key)
+        if text is None:
+            minutes, seconds = divmod(key, 60)
+            text = f"{minutes:02d}:{seconds:02d}"
+            if len(duration_cache) >= MAX_TIME_CACHE:
+                duration_cache.clear()
+            duration_cache[key] = text
+        return text
 
     def update_display(time_ms, begin_time, result, sentence_idx=None):
         """在同一行动态更新显示"""
-        nonlocal animation_idx, last_display_time
+        nonlocal animation_idx, last_display_time, last_render
 
         last_display_time = time_ms
 
@@ -229,16 +287,21 @@ async def receive_messages_new(ws, task_id):
 
         # 构建显示内容
         time_str = f"{format_time_hms(begin_time)} - {format_duration(duration_ms)}"
-        animation = animation_frames[animation_idx % len(animation_frames)]
-        animation_idx += 1
-
-        # 清空当前行并显示新内容
         if sentence_idx is not None:
-            display = f"\r{animation} {sentence_idx}. {time_str} | {result:<50}"
+            content = f"{sentence_idx}. {time_str} | {result}"
         else:
-            display = f"\r{animation} {time_str} | {result:<50}"
+            content = f"{time_str} | {result}"
+
+        # 内容未变化时不重复写终端
+        if content == last_render:
+            return
+        last_render = content
+
+        animation = animation_frames[animation_idx % len(animation_frames)]
+        animation_idx += 1
 
-        sys.stdout.write(display)
+        # 回到行首显示新内容，并清除到行尾
+        sys.stdout.write(f"\r{animation} {content}\x1b[K")
         sys.stdout.flush()
 
     async def snake_animation():
@@ -248,19 +311,22 @@ async def receive_messages_new(ws, task_id):
         pos = 0
         direction = 1
 
+        def make_bar(pos):
+            """构建蛇头位于 pos 的蛇形条"""
+            snake_bar = ["·"] * width
+            for i in range(max(0, pos - 2), min(width, pos + 1)):
+                snake_bar[i] = "="
+            return "".join(snake_bar)
+
+        # 预先构建所有位置的蛇形条，每帧只需查表
+        bars = tuple(make_bar(p) for p in range(width))
+
         while not snake_stop_event.is_set():
             if not show_snake_animation:
                 await asyncio.sleep(0.05)
                 continue
 
-            # 构建蛇形条
-            snake_bar = ["·"] * width
-            for i in range(max(0, pos - 2), min(width, pos + 1)):
-                snake_bar[i] = "="
-            if pos < width:
-                snake_bar[pos] = "="
-
-            output = f"\r  等待语音输入 [{''.join(snake_bar)}]"
+            output = f"\r  等待语音输入 [{bars[pos]}]"
             sys.stdout.write(output)
             sys.stdout.flush()
 
@@ -274,83 +340,92 @@ async def receive_messages_new(ws, task_id):
             await asyncio.sleep(0.1)
 
         # 清除蛇形动画行
-        sys.stdout.write("\r" + " " * 80 + "\r")
+        sys.stdout.write("\r\x1b[2K")
         sys.stdout.flush()
 
+    def on_sentence_begin(payload):
+        """处理 SentenceBegin 消息"""
+        index = payload.get("idx", 0)
+        time_ms = payload.get("time", 0)
+        current_sentence.begin(index, time_ms)
+
+    def on_result(payload):
+        """处理 Result 消息"""
+        nonlocal show_snake_animation
+        index = payload.get("idx", 0)
+        time_ms = payload.get("time", 0)
+        result = payload.get("text", "")
+
+        # 停止蛇形动画，显示识别结果
+        if show_snake_animation:
+            show_snake_animation = False
+            # 清除蛇形动画行
+            sys.stdout.write("\r\x1b[2K")
+            sys.stdout.flush()
+
+        # 动态更新显示（需要获取 begin_time）
+        begin_time = current_sentence.begin_time if current_sentence.active else time_ms
+        update_display(time_ms, begin_time, result, index)
+
+        if current_sentence.active and current_sentence.index == index:
+            current_sentence.current_result = result
+            current_sentence.current_time = time_ms
+
+    def on_sentence_end(payload):
+        """处理 SentenceEnd 消息"""
+        nonlocal show_snake_animation, last_render
+        index = payload.get("idx", 0)
+        time_ms = payload.get("time", 0)
+        begin_time = payload.get("begin", 0)
+        result = payload.get("text", "")
+
+        # 句子结束时，换行显示最终结果
+        # 清除当前行并显示完成状态
+        sys.stdout.write("\r\x1b[2K")
+
+        duration_ms = time_ms - begin_time
+        time_str = f"{format_time_hms(begin_time)} - {format_duration(duration_ms)}"
+        print(f"✓ {index}. {time_str} | {result}")
+
+        all_results.append({
+            "index": index,
+            "begin_time": begin_time,
+            "end_time": time_ms,
+            "result": result
+        })
+
+        current_sentence.reset()
+        last_render = None
+        # 句子结束后，恢复蛇形动画
+        show_snake_animation = True
+
+    # 消息名到处理函数的分发表（Completed/Failed 需要结束循环，单独处理）
+    handlers = {
+        "SentenceBegin": on_sentence_begin,
+        "Result": on_result,
+        "SentenceEnd": on_sentence_end,
+    }
+
     # 启动蛇形动画任务
     snake_task = asyncio.create_task(snake_animation())
 
     try:
         while True:
-            # 接收消息（带超时）
-            try:
-                message = await asyncio.wait_for(ws.recv(), timeout=5)
-            except asyncio.TimeoutError:
-                # 如果没有更多消息，继续等待
-                continue
+            # 接收消息（超时由调用方在发送 End 后统一控制）
+            message = await ws.recv()
 
             if isinstance(message, str):
                 # 文本消息（JSON）
                 try:
-                    data = json.loads(message)
+                    data = json_loads(message)
                     header = data.get("header", {})
                     name = header.get("name", "UNKNOWN")
                     status = header.get("status", -1)
                     message_count += 1
 
-                    if name == "SentenceBegin":
-                        payload = data.get("payload", {})
-                        index = payload.get("idx", 0)
-                        time_ms = payload.get("time", 0)
-                        current_sentence = {"index": index, "begin_time": time_ms}
-
-                    elif name == "Result":
-                        payload = data.get("payload", {})
-                        index = payload.get("idx", 0)
-                        time_ms = payload.get("time", 0)
-                        result = payload.get("text", "")
-
-                        # 停止蛇形动画，显示识别结果
-                        if show_snake_animation:
-                            show_snake_animation = False
-                            # 清除蛇形动画行
-                            sys.stdout.write("\r" + " " * 80 + "\r")
-                            sys.stdout.flush()
-
-                        # 动态更新显示（需要获取 begin_time）
-                        begin_time = current_sentence.get("begin_time", time_ms) if current_sentence else time_ms
-                        update_display(time_ms, begin_time, result, index)
-
-                        if current_sentence and current_sentence["index"] == index:
-                            current_sentence["current_result"] = result
-                            current_sentence["current_time"] = time_ms
-
-                    elif name == "SentenceEnd":
-                        payload = data.get("payload", {})
-                        index = payload.get("idx", 0)
-                        time_ms = payload.get("time", 0)
-                        begin_time = payload.get("begin", 0)
-                        result = payload.get("text", "")
-
-                        # 句子结束时，换行显示最终结果
-                        # 清除当前行并显示完成状态
-                        sys.stdout.write("\r")  # 回到行首
-                        sys.stdout.flush()
-
-                        duration_ms = time_ms - begin_time
-                        time_str = f"{format_time_hms(begin_time)} - {format_duration(duration_ms)}"
-                        print(f"✓ {index}. {time_str} | {result}")
-
-                        all_results.append({
-                            "index": index,
-                            "begin_time": begin_time,
-                            "end_time": time_ms,
-                            "result": result
-                        })
-
-                        current_sentence = None
-                        # 句子结束后，恢复蛇形动画
-                        show_snake_animation = True
+                    handler = handlers.get(name)
+                    if handler is not None:
+                        handler(data.get("payload", {}))
 
                     elif name == "Completed":
                         print("转录完成")
@@ -385,15 +460,33 @@ async def receive_messages_new(ws, task_id):
     #        print(f"  句子 {result['index']}: [{result['begin_time']}ms-{result['end_time']}ms] {result['result']}")
 
 
+def run_event_loop(main_coro):
+    """运行协程，Linux/macOS 上如已安装 uvloop 则使用 uvloop 事件循环"""
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            # uvloop.run 从 0.18 起才提供，旧版本（如发行版自带的包）改用 install
+            if hasattr(uvloop, "run"):
+                return uvloop.run(main_coro)
+            uvloop.install()
+    return asyncio.run(main_coro)
+
+
 def main():
     parser = argparse.ArgumentParser(description="测试 zasr-server 识别功能")
     parser.add_argument("audio_file", help="音频文件路径（WAV格式）")
     parser.add_argument("--server", default="ws://localhost:2026", 
                        help="WebSocket 服务器地址（默认: ws://localhost:2026）")
+    parser.add_argument("--batches-per-send", type=int, default=1,
+                       help="每个 WebSocket 帧合并发送的音频批次数（默认: 1）")
     
     args = parser.parse_args()
     
-    asyncio.run(test_zasr_server_new(args.audio_file, args.server))
+    run_event_loop(test_zasr_server_new(args.audio_file, args.server,
+                                       max(1, args.batches_per_send)))
 
 
 if __name__ == "__main__":